@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
+from sqlalchemy import insert
 from sqlalchemy.orm import Session, joinedload
+from pydantic import TypeAdapter
 from typing import List, Optional
 from app.database import get_db
 from app.core.deps import get_current_active_user, get_current_admin_user
@@ -8,14 +10,24 @@ from app.models.train import Train, MaintenanceRecord, PerformanceMetric, TrainS
 from app.schemas.train import (
     Train as TrainSchema, TrainCreate, TrainUpdate, TrainWithDetails,
     MaintenanceRecord as MaintenanceRecordSchema, MaintenanceRecordCreate, MaintenanceRecordUpdate,
-    PerformanceMetric as PerformanceMetricSchema, PerformanceMetricCreate
+    PerformanceMetric as PerformanceMetricSchema, PerformanceMetricCreate, PerformanceMetricStruct
 )
+from app.schemas import json_response
 from datetime import datetime, timedelta
+import msgspec
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/trains", tags=["trains"])
 
+# Serializers compiled once at router setup; returning a raw Response skips
+# FastAPI's per-request response_model validation and jsonable_encoder walk.
+train_list_adapter = TypeAdapter(List[TrainSchema])
+train_details_adapter = TypeAdapter(TrainWithDetails)
+maintenance_list_adapter = TypeAdapter(List[MaintenanceRecordSchema])
+performance_list_adapter = TypeAdapter(List[PerformanceMetricSchema])
+performance_ingest_decoder = msgspec.json.Decoder(List[PerformanceMetricStruct])
+
 @router.get("/", response_model=List[TrainSchema])
 async def get_trains(
     skip: int = Query(0, ge=0),
@@ -43,7 +55,7 @@ async def get_trains(
         )
     
     trains = query.offset(skip).limit(limit).all()
-    return trains
+    return json_response(train_list_adapter, trains)
 
 @router.get("/{train_id}", response_model=TrainWithDetails)
 async def get_train(
@@ -63,7 +75,7 @@ async def get_train(
             detail="Train not found"
         )
     
-    return train
+    return json_response(train_details_adapter, train)
 
 @router.post("/", response_model=TrainSchema, status_code=status.HTTP_201_CREATED)
 async def create_train(
@@ -163,7 +175,7 @@ async def get_train_maintenance_records(
         MaintenanceRecord.train_id == train_id
     ).offset(skip).limit(limit).all()
     
-    return records
+    return json_response(maintenance_list_adapter, records)
 
 @router.post("/{train_id}/maintenance", response_model=MaintenanceRecordSchema, status_code=status.HTTP_201_CREATED)
 async def create_maintenance_record(
@@ -238,7 +250,7 @@ async def get_train_performance_metrics(
         query = query.filter(PerformanceMetric.date_recorded <= end_date)
     
     metrics = query.offset(skip).limit(limit).all()
-    return metrics
+    return json_response(performance_list_adapter, metrics)
 
 @router.post("/{train_id}/performance", response_model=PerformanceMetricSchema, status_code=status.HTTP_201_CREATED)
 async def create_performance_metric(
@@ -262,6 +274,54 @@ async def create_performance_metric(
     
     return metric
 
+@router.post("/{train_id}/performance/bulk", status_code=status.HTTP_201_CREATED)
+async def ingest_performance_metrics(
+    train_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_active_user)
+):
+    """Bulk ingest performance metrics for a train, validated with msgspec"""
+    try:
+        metrics = performance_ingest_decoder.decode(await request.body())
+    except msgspec.ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=str(e)
+        )
+    except msgspec.DecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid JSON body"
+        )
+    
+    if any(metric.train_id != train_id for metric in metrics):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="All metrics must belong to the train in the path"
+        )
+    
+    train = db.query(Train).filter(Train.id == train_id).first()
+    if not train:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Train not found"
+        )
+    
+    metric_ids = []
+    if metrics:
+        metric_ids = db.scalars(
+            insert(PerformanceMetric).returning(PerformanceMetric.id),
+            [msgspec.structs.asdict(metric) for metric in metrics]
+        ).all()
+        db.commit()
+    
+    return {
+        "train_id": train_id,
+        "ingested": len(metric_ids),
+        "metric_ids": list(metric_ids)
+    }
+
 @router.get("/statistics/overview")
 async def get_trains_overview(
     db: Session = Depends(get_db),
@@ -3,7 +3,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import Optional
 from app.core.security import verify_token
 from app.models.user import User
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.orm import Session, selectinload
 
 security = HTTPBearer()
 
@@ -32,7 +33,9 @@ def get_current_user_from_token(token: str, db: Session) -> User:
     if user_id is None:
         raise AuthenticationError()
     
-    user = db.query(User).filter(User.id == user_id).first()
+    user = db.execute(
+        select(User).options(selectinload(User.roles)).where(User.id == user_id)
+    ).scalar_one_or_none()
     if user is None:
         raise AuthenticationError("User not found")
     
@@ -1,19 +1,42 @@
-from sqlalchemy import create_engine, MetaData
+from sqlalchemy import create_engine, MetaData, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 from app.config import settings
+from concurrent.futures import ThreadPoolExecutor
 import logging
 
 logger = logging.getLogger(__name__)
 
 # Create database engine
-engine = create_engine(
-    settings.database_url,
-    echo=settings.database_echo,
-    poolclass=StaticPool,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.database_url else {}
-)
+if "sqlite" in settings.database_url:
+    engine = create_engine(
+        settings.database_url,
+        echo=settings.database_echo,
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False}
+    )
+else:
+    # TCP keepalives are libpq options, so only psycopg-driven PostgreSQL URLs get them
+    database_url = make_url(settings.database_url)
+    connect_args = {}
+    if database_url.get_backend_name() == "postgresql" and database_url.get_driver_name().startswith("psycopg"):
+        connect_args = {"keepalives": 1, "keepalives_idle": 30}
+    
+    # Sized queue pool; LIFO keeps recently used connections hot and
+    # pool_recycle replaces the per-checkout pre-ping round-trip
+    engine = create_engine(
+        settings.database_url,
+        echo=settings.database_echo,
+        pool_size=settings.database_pool_size,
+        max_overflow=settings.database_max_overflow,
+        pool_recycle=settings.database_pool_recycle,
+        pool_pre_ping=False,
+        pool_use_lifo=True,
+        query_cache_size=1200,
+        connect_args=connect_args
+    )
 
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -36,6 +59,23 @@ def get_db():
     finally:
         db.close()
 
+def warm_pool(connections: int = None):
+    """Pre-establish pooled connections so the first requests skip the connect burst"""
+    if isinstance(engine.pool, StaticPool):
+        return
+    connections = connections or settings.database_pool_size
+
+    def _checkout(_):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+
+    try:
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(_checkout, range(connections)))
+        logger.info(f"Database pool warmed with {connections} connections")
+    except Exception as e:
+        logger.error(f"Error warming database pool: {e}")
+
 def create_tables():
     """Create all tables in the database"""
     try:
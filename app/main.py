@@ -4,13 +4,15 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPBearer
 from contextlib import asynccontextmanager
+import asyncio
 import time
 import uuid
 from typing import Dict, Any
 
 from app.config import settings
-from app.database import engine, Base
+from app.database import engine, Base, warm_pool
 from app.core.auth import get_current_user
+from app.services.notification_service import close_notification_service
 from app.utils.logger import app_logger, get_logger
 from app.api import trains, analytics, optimization, simulation
 
@@ -33,10 +35,16 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to create database tables: {e}")
         raise
     
+    # Pre-establish pooled connections
+    warm_pool()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down Train Management System")
+    
+    # Deliver notifications that were accepted as queued but not yet sent
+    await asyncio.to_thread(close_notification_service)
 
 # Create FastAPI application
 app = FastAPI(
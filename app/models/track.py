@@ -21,7 +21,7 @@ class Track(Base):
     __tablename__ = "tracks"
     
     id = Column(Integer, primary_key=True, index=True)
-    track_number = Column(String(20), unique=True, nullable=False, index=True)
+    track_number = Column(String(20).with_variant(String(20, collation="C"), "postgresql"), unique=True, nullable=False, index=True)
     name = Column(String(100), nullable=False)
     track_type = Column(Enum(TrackType), nullable=False)
     status = Column(Enum(TrackStatus), default=TrackStatus.OPERATIONAL)
@@ -97,7 +97,7 @@ class Station(Base):
     __tablename__ = "stations"
     
     id = Column(Integer, primary_key=True, index=True)
-    code = Column(String(10), unique=True, nullable=False, index=True)
+    code = Column(String(10).with_variant(String(10, collation="C"), "postgresql"), unique=True, nullable=False, index=True)
     name = Column(String(100), nullable=False)
     
     # Location data
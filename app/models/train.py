@@ -21,7 +21,7 @@ class Train(Base):
     __tablename__ = "trains"
     
     id = Column(Integer, primary_key=True, index=True)
-    train_number = Column(String(20), unique=True, nullable=False, index=True)
+    train_number = Column(String(20).with_variant(String(20, collation="C"), "postgresql"), unique=True, nullable=False, index=True)
     name = Column(String(100), nullable=False)
     train_type = Column(Enum(TrainType), nullable=False)
     status = Column(Enum(TrainStatus), default=TrainStatus.ACTIVE)
@@ -2,6 +2,9 @@
 Pydantic schemas for API serialization and validation.
 """
 
+from fastapi import Response
+from pydantic import TypeAdapter
+
 from app.schemas.train import (
     TrainCreate,
     TrainUpdate, 
@@ -54,5 +57,36 @@ __all__ = [
     "ScheduleStopResponse", 
     "IncidentCreate",
     "IncidentUpdate",
-    "IncidentResponse"
+    "IncidentResponse",
+    
+    # Serialization helpers
+    "json_response"
 ]
+
+def json_response(adapter: TypeAdapter, rows) -> Response:
+    """Validate ORM rows through a precompiled adapter and dump straight to JSON bytes"""
+    return Response(
+        content=adapter.dump_json(adapter.validate_python(rows, from_attributes=True)),
+        media_type="application/json"
+    )
+
+# Resolve string forward references eagerly so the first request does not pay
+# for ref resolution and core-schema generation
+from app.schemas.train import Train, TrainWithDetails, MaintenanceRecord, PerformanceMetric
+from app.schemas.track import Track, TrackWithDetails, TrackSegment, Station
+from app.schemas.schedule import ScheduleWithDetails, ScheduleStop, Incident
+
+_forward_refs = {
+    "Train": Train,
+    "Track": Track,
+    "Station": Station,
+    "TrackSegment": TrackSegment,
+    "ScheduleStop": ScheduleStop,
+    "Incident": Incident,
+    "MaintenanceRecord": MaintenanceRecord,
+    "PerformanceMetric": PerformanceMetric
+}
+
+ScheduleWithDetails.model_rebuild(_types_namespace=_forward_refs)
+TrackWithDetails.model_rebuild(_types_namespace=_forward_refs)
+TrainWithDetails.model_rebuild(_types_namespace=_forward_refs)
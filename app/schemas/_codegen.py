@@ -0,0 +1,79 @@
+"""
+Derive SQLAlchemy String column lengths from Pydantic ``Field(max_length=...)``.
+
+Run as ``python -m app.schemas._codegen`` (e.g. from a pre-commit hook) to print
+the generated ``Column(String(n))`` declarations; ``--check`` exits non-zero when
+an ORM column length has drifted from its schema.
+"""
+
+import sys
+from typing import Dict, List, Tuple, Type
+from annotated_types import MaxLen
+from pydantic import BaseModel
+from sqlalchemy import String
+from app.database import Base
+from app.models.train import Train, MaintenanceRecord
+from app.models.track import Track, TrackSegment, Station
+from app.models.schedule import Schedule, ScheduleStop, Incident
+from app.schemas.train import TrainBase, MaintenanceRecordBase
+from app.schemas.track import TrackBase, TrackSegmentBase, StationBase
+from app.schemas.schedule import ScheduleBase, ScheduleStopBase, IncidentUpdate
+
+# Schema that owns the string constraints for each ORM model
+SCHEMA_MODEL_PAIRS: List[Tuple[Type[BaseModel], Type[Base]]] = [
+    (TrainBase, Train),
+    (MaintenanceRecordBase, MaintenanceRecord),
+    (TrackBase, Track),
+    (TrackSegmentBase, TrackSegment),
+    (StationBase, Station),
+    (ScheduleBase, Schedule),
+    (ScheduleStopBase, ScheduleStop),
+    (IncidentUpdate, Incident),
+]
+
+def schema_max_lengths(schema: Type[BaseModel]) -> Dict[str, int]:
+    """Collect max_length constraints declared on a schema's fields"""
+    lengths = {}
+    for name, field in schema.model_fields.items():
+        for constraint in field.metadata:
+            if isinstance(constraint, MaxLen):
+                lengths[name] = constraint.max_length
+    return lengths
+
+def generate_columns(schema: Type[BaseModel]) -> List[str]:
+    """Emit Column(String(n)) declarations for a schema"""
+    return [
+        f"{name} = Column(String({length}))"
+        for name, length in schema_max_lengths(schema).items()
+    ]
+
+def find_drift(schema: Type[BaseModel], model: Type[Base]) -> List[str]:
+    """Report ORM String columns whose length differs from the schema"""
+    drift = []
+    columns = model.__table__.columns
+    for name, length in schema_max_lengths(schema).items():
+        if name not in columns:
+            continue
+        column_type = columns[name].type
+        if isinstance(column_type, String) and column_type.length != length:
+            drift.append(
+                f"{model.__tablename__}.{name}: String({column_type.length}) != max_length={length}"
+            )
+    return drift
+
+def main(argv: List[str]) -> int:
+    drift = []
+    for schema, model in SCHEMA_MODEL_PAIRS:
+        drift.extend(find_drift(schema, model))
+        if "--check" not in argv:
+            print(f"# {model.__name__} ({schema.__name__})")
+            for line in generate_columns(schema):
+                print(line)
+            print()
+
+    for line in drift:
+        print(f"DRIFT {line}", file=sys.stderr)
+    return 1 if drift else 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,8 +1,28 @@
-from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
-from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict, AfterValidator, BeforeValidator, field_serializer
+from typing import Optional, Tuple, Any, Annotated
+from datetime import datetime, timedelta, timezone
 from app.models.schedule import ScheduleStatus, ScheduleType
 
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+def _parse_epoch_micros(value: Any) -> Any:
+    """Accept integer epoch microseconds alongside ISO-8601 strings and datetimes"""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return EPOCH_UTC + value * MICROSECOND
+    return value
+
+def _as_utc(value: datetime) -> datetime:
+    """Treat offset-less datetimes as UTC rather than server-local time"""
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+def _to_epoch_micros(value: datetime) -> int:
+    """Serialize a datetime as integer epoch microseconds"""
+    return (_as_utc(value) - EPOCH_UTC) // MICROSECOND
+
+# Schedule times accept epoch microseconds, ISO-8601 strings or datetimes, and are always timezone-aware
+ScheduleTime = Annotated[datetime, BeforeValidator(_parse_epoch_micros), AfterValidator(_as_utc)]
+
 class ScheduleBase(BaseModel):
     schedule_number: str = Field(..., min_length=1, max_length=20)
     name: str = Field(..., min_length=1, max_length=100)
@@ -12,8 +32,8 @@ class ScheduleBase(BaseModel):
     track_id: int
     departure_station_id: int
     arrival_station_id: int
-    scheduled_departure: datetime
-    scheduled_arrival: datetime
+    scheduled_departure: ScheduleTime
+    scheduled_arrival: ScheduleTime
     distance: Optional[float] = Field(None, ge=0)
     estimated_duration: Optional[int] = Field(None, ge=0)
     max_speed: Optional[float] = Field(None, ge=0)
@@ -36,8 +56,8 @@ class ScheduleUpdate(BaseModel):
     track_id: Optional[int] = None
     departure_station_id: Optional[int] = None
     arrival_station_id: Optional[int] = None
-    scheduled_departure: Optional[datetime] = None
-    scheduled_arrival: Optional[datetime] = None
+    scheduled_departure: Optional[ScheduleTime] = None
+    scheduled_arrival: Optional[ScheduleTime] = None
     actual_departure: Optional[datetime] = None
     actual_arrival: Optional[datetime] = None
     distance: Optional[float] = Field(None, ge=0)
@@ -71,14 +91,20 @@ class Schedule(ScheduleBase):
     created_at: datetime
     updated_at: Optional[datetime] = None
     created_by: Optional[int] = None
+    
+    @field_serializer("scheduled_departure", "scheduled_arrival")
+    def _serialize_schedule_times(self, value: datetime) -> int:
+        return _to_epoch_micros(value)
 
 class ScheduleWithDetails(Schedule):
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
     train: Optional["Train"] = None
     track: Optional["Track"] = None
     departure_station: Optional["Station"] = None
     arrival_station: Optional["Station"] = None
-    schedule_stops: List["ScheduleStop"] = []
-    incidents: List["Incident"] = []
+    schedule_stops: Tuple["ScheduleStop", ...] = Field(default_factory=tuple)
+    incidents: Tuple["Incident", ...] = Field(default_factory=tuple)
 
 class ScheduleStopBase(BaseModel):
     schedule_id: int
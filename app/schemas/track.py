@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Optional, Tuple
 from datetime import datetime
 from app.models.track import TrackType, TrackStatus
 
@@ -58,7 +58,9 @@ class Track(TrackBase):
     updated_at: Optional[datetime] = None
 
 class TrackWithDetails(Track):
-    track_segments: List["TrackSegment"] = []
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
+    track_segments: Tuple["TrackSegment", ...] = Field(default_factory=tuple)
 
 class TrackSegmentBase(BaseModel):
     track_id: int
@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field, ConfigDict
-from typing import Optional, List
+from typing import Optional, Tuple, Annotated
 from datetime import datetime
+import msgspec
 from app.models.train import TrainType, TrainStatus
 
 class TrainBase(BaseModel):
@@ -61,8 +62,10 @@ class Train(TrainBase):
     created_by: Optional[int] = None
 
 class TrainWithDetails(Train):
-    maintenance_records: List["MaintenanceRecord"] = []
-    performance_metrics: List["PerformanceMetric"] = []
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+    
+    maintenance_records: Tuple["MaintenanceRecord", ...] = Field(default_factory=tuple)
+    performance_metrics: Tuple["PerformanceMetric", ...] = Field(default_factory=tuple)
 
 class MaintenanceRecordBase(BaseModel):
     train_id: int
@@ -110,6 +113,23 @@ class PerformanceMetricBase(BaseModel):
 class PerformanceMetricCreate(PerformanceMetricBase):
     pass
 
+NonNegative = msgspec.Meta(ge=0)
+Percentage = msgspec.Meta(ge=0, le=100)
+
+class PerformanceMetricStruct(msgspec.Struct):
+    """msgspec mirror of PerformanceMetricBase for the high-throughput ingest path"""
+    train_id: int
+    date_recorded: datetime
+    distance_traveled: Optional[Annotated[float, NonNegative]] = None
+    fuel_consumed: Optional[Annotated[float, NonNegative]] = None
+    average_speed: Optional[Annotated[float, NonNegative]] = None
+    max_speed_reached: Optional[Annotated[float, NonNegative]] = None
+    on_time_performance: Optional[Annotated[float, Percentage]] = None
+    passenger_count: Optional[Annotated[int, NonNegative]] = None
+    engine_temperature: Optional[float] = None
+    brake_efficiency: Optional[Annotated[float, Percentage]] = None
+    energy_consumption: Optional[Annotated[float, NonNegative]] = None
+
 class PerformanceMetric(PerformanceMetricBase):
     model_config = ConfigDict(from_attributes=True)
     
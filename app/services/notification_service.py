@@ -1,14 +1,29 @@
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Callable, ClassVar, Tuple
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache, cache
 from enum import Enum
 import smtplib
-import json
+import msgspec
+import numpy as np
 import logging
+import queue
+import threading
+import random
+import uuid
+import zlib
+import time
+import asyncio
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from collections import deque
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from app.config import settings
 from app.core.deps import get_redis
 import redis
+import redis.asyncio
+import httpx
 
 logger = logging.getLogger(__name__)
 
@@ -25,12 +40,254 @@ class NotificationPriority(str, Enum):
     HIGH = "high"
     CRITICAL = "critical"
 
+@lru_cache(maxsize=1)
+def _utc_second(second: int) -> Tuple[str, str]:
+    """ISO and display renderings of one UTC second"""
+    now = datetime.fromtimestamp(second, timezone.utc).replace(tzinfo=None)
+    return now.isoformat(), now.strftime('%Y-%m-%d %H:%M')
+
+def utc_now_iso() -> str:
+    """Current UTC time as an ISO string, formatted at most once per second"""
+    return _utc_second(int(time.time()))[0]
+
+def utc_now_display() -> str:
+    """Current UTC minute for message bodies, formatted at most once per second"""
+    return _utc_second(int(time.time()))[1]
+
+# Rendered alert bodies kept per template; keys include the minute they were rendered in
+MESSAGE_CACHE_SIZE = 2048
+
+def _encode_numpy_scalar(obj: Any) -> Any:
+    """msgspec hook for NumPy scalars (e.g. model outputs in report metadata), which json.dumps accepted"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise NotImplementedError(f"Encoding objects of type {type(obj).__name__} is unsupported")
+
+# Records are stored in Redis as MessagePack; JSON records written before the switch stay readable
+record_encoder = msgspec.msgpack.Encoder(enc_hook=_encode_numpy_scalar)
+record_decoder = msgspec.msgpack.Decoder()
+legacy_record_decoder = msgspec.json.Decoder()
+
+# Records larger than this are stored zlib-compressed behind a "z:" prefix
+RECORD_COMPRESS_THRESHOLD = 16384  # bytes
+RECORD_COMPRESS_LEVEL = 3
+COMPRESSED_RECORD_PREFIX = b'z:'
+
+def serialize_record(record: Dict[str, Any]) -> bytes:
+    """Encode a record for storage in Redis, compressing large payloads such as performance reports"""
+    data = record_encoder.encode(record)
+    if len(data) > RECORD_COMPRESS_THRESHOLD:
+        return COMPRESSED_RECORD_PREFIX + zlib.compress(data, RECORD_COMPRESS_LEVEL)
+    return data
+
+def deserialize_record(data: bytes) -> Dict[str, Any]:
+    """Decode a stored record, accepting compressed records and the older JSON encoding"""
+    if data[:2] == COMPRESSED_RECORD_PREFIX:
+        data = zlib.decompress(data[2:])
+    if data[:1] == b'{':
+        return legacy_record_decoder.decode(data)
+    return record_decoder.decode(data)
+
+# Shared pool for per-channel delivery; channel sends are network-bound
+channel_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='notification')
+
+# In-app notifications: one capped stream per recipient, kept 7 days after the last write
+IN_APP_STREAM_LENGTH = 200
+IN_APP_TTL = 604800
+
+# Background delivery queue for send_notification
+NOTIFICATION_QUEUE_SIZE = 10000
+NOTIFICATION_WORKERS = 4
+NOTIFICATION_WORKER_BATCH = 100  # Queued notifications stored per Redis pipeline
+
+# Buffered Redis writes for LOW/MEDIUM priority records; the oldest are dropped if Redis falls behind
+BUFFERED_PRIORITIES = frozenset({NotificationPriority.LOW.value, NotificationPriority.MEDIUM.value})
+WRITE_BUFFER_SIZE = 10000
+WRITE_FLUSH_INTERVAL = 0.1  # seconds
+WRITE_FLUSH_BATCH = 500
+REDIS_MAX_CONNECTIONS = 32
+
+# Notification records live for 24 hours; the history indexes are sorted sets scored by send time
+NOTIFICATION_TTL = 86400
+NOTIFICATION_INDEX = "notification_index"
+
+# SMTP connection reuse limits
+SMTP_POOL_SIZE = 5
+SMTP_MESSAGES_PER_CONNECTION = 100
+SMTP_IDLE_CHECK_SECONDS = 30  # NOOP-check connections idle longer than this
+EMAIL_BCC_BATCH_SIZE = 50
+
+WEBHOOK_TIMEOUT = 5.0  # seconds
+
+class SMTPConnectionPool:
+    """Bounded pool of authenticated SMTP connections reused across messages"""
+    
+    def __init__(self, maxsize: int = SMTP_POOL_SIZE):
+        # Entries are (connection, messages_sent, last_used) so counters never need a lock
+        self._pool = queue.Queue(maxsize=maxsize)
+        # Caps connections in use; new ones are only opened when none are idle, so this
+        # also caps live connections. Further senders wait for a slot.
+        self._slots = threading.BoundedSemaphore(maxsize)
+    
+    def send(self, msg: MIMEMultipart, to_addrs: List[str]):
+        """Send a message on a pooled connection, reconnecting once if the server dropped it"""
+        with self._slots:
+            conn, messages_sent = self._checkout()
+            try:
+                conn.send_message(msg, to_addrs=to_addrs)
+            except smtplib.SMTPServerDisconnected:
+                self._close(conn)
+                conn, messages_sent = self._connect(), 0
+                try:
+                    conn.send_message(msg, to_addrs=to_addrs)
+                except Exception:
+                    self._close(conn)
+                    raise
+            except Exception:
+                self._close(conn)
+                raise
+            
+            self._checkin(conn, messages_sent + 1)
+    
+    def _checkout(self):
+        try:
+            conn, messages_sent, last_used = self._pool.get_nowait()
+        except queue.Empty:
+            return self._connect(), 0
+        
+        if time.monotonic() - last_used > SMTP_IDLE_CHECK_SECONDS:
+            try:
+                conn.noop()
+            except (smtplib.SMTPException, OSError):
+                self._close(conn)
+                return self._connect(), 0
+        return conn, messages_sent
+    
+    def _checkin(self, conn: smtplib.SMTP, messages_sent: int):
+        if messages_sent >= SMTP_MESSAGES_PER_CONNECTION:
+            self._close(conn)
+            return
+        try:
+            self._pool.put_nowait((conn, messages_sent, time.monotonic()))
+        except queue.Full:
+            self._close(conn)
+    
+    def _connect(self) -> smtplib.SMTP:
+        conn = smtplib.SMTP_SSL(settings.smtp_host, settings.smtp_port, timeout=settings.smtp_timeout)
+        if settings.smtp_username:
+            try:
+                conn.login(settings.smtp_username, settings.smtp_password)
+            except Exception:
+                self._close(conn)
+                raise
+        return conn
+    
+    def _close(self, conn: smtplib.SMTP):
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
 class NotificationService:
     """Service for handling various types of notifications"""
     
+    # Notification templates
+    notification_templates: ClassVar[Dict[str, str]] = {
+        'delay_alert': "Train delay alert: Schedule {schedule_id} is delayed by {delay_minutes} minutes, affecting {affected_passengers} passengers.",
+        'maintenance_reminder': "Maintenance reminder: Train {train_number} requires maintenance in {days_until_maintenance} days.",
+        'incident_alert': "Incident alert: {incident_type} ({severity}) - {description}. Affected services: {affected_services}.",
+        'performance_report': "Performance report for {period}: {summary}"
+    }
+    
+    # Channel -> handler(service, recipient, subject, message, metadata)
+    CHANNEL_HANDLERS: ClassVar[Dict[NotificationChannel, Callable[..., Dict[str, Any]]]] = {
+        NotificationChannel.EMAIL: lambda self, recipient, subject, message, metadata:
+            self._send_email(recipient, subject, message),
+        NotificationChannel.SMS: lambda self, recipient, subject, message, metadata:
+            self._send_sms(recipient, message),
+        NotificationChannel.PUSH: lambda self, recipient, subject, message, metadata:
+            self._send_push(recipient, subject, message),
+        NotificationChannel.WEBHOOK: lambda self, recipient, subject, message, metadata:
+            self._send_webhook(recipient, subject, message, metadata),
+        NotificationChannel.IN_APP: lambda self, recipient, subject, message, metadata:
+            self._send_in_app(recipient, subject, message)
+    }
+    
+    # Message bodies rendered by the _format_*_message methods
+    MESSAGE_TEMPLATES: ClassVar[Dict[str, str]] = {
+        'delay_alert': """
+        TRAIN DELAY ALERT
+        
+        Schedule ID: {schedule_id}
+        Delay: {delay_minutes} minutes
+        Affected Passengers: {affected_passengers}
+        
+        Please take appropriate action to minimize passenger impact.
+        
+        Time: {time} UTC
+        """,
+        'maintenance_reminder': """
+        {urgency} MAINTENANCE REMINDER
+        
+        Train: {train_number}
+        Maintenance Due: {days_until_maintenance} days
+        
+        Please schedule maintenance to avoid service disruption.
+        
+        Time: {time} UTC
+        """,
+        'incident_alert': """
+        INCIDENT ALERT - {severity_upper}
+        
+        Type: {incident_type}
+        Severity: {severity}
+        Description: {description}
+        
+        Affected Services:
+        {affected_services}
+        
+        Time: {time} UTC
+        """,
+        'performance_report': """
+        PERFORMANCE REPORT - {period}
+        
+        Summary:
+        - On-time Performance: {on_time_performance:.1f}%
+        - Total Schedules: {total_schedules}
+        - Completed Schedules: {completed_schedules}
+        - Average Delay: {average_delay:.1f} minutes
+        
+        Time: {time} UTC
+        """
+    }
+    
     def __init__(self):
-        self.redis_client = redis.from_url(settings.redis_url, decode_responses=True)
-        self.notification_templates = self._load_templates()
+        # Binary clients: stored records are MessagePack bytes
+        self.redis_client = redis.Redis(connection_pool=redis.BlockingConnectionPool.from_url(
+            settings.redis_url, max_connections=REDIS_MAX_CONNECTIONS, socket_keepalive=True, decode_responses=False
+        ))
+        self.async_redis_client = redis.asyncio.from_url(settings.redis_url, decode_responses=False)
+        self.smtp_pool = SMTPConnectionPool()
+        
+        # One keep-alive HTTP/2 client shared by every webhook
+        self.http_client = httpx.Client(
+            http2=True,
+            timeout=WEBHOOK_TIMEOUT,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+        )
+        atexit.register(self.http_client.close)
+        
+        # Fire-and-forget queue drained by background delivery workers; close() stops intake and drains it
+        self._queue = queue.Queue(maxsize=NOTIFICATION_QUEUE_SIZE)
+        self._closing = threading.Event()
+        for i in range(NOTIFICATION_WORKERS):
+            threading.Thread(target=self._worker, name=f'notification-worker-{i}', daemon=True).start()
+        
+        # Non-critical records are written to Redis off the request path; close() flushes what is left
+        self._write_buffer = deque(maxlen=WRITE_BUFFER_SIZE)
+        self._writes_stopped = threading.Event()
+        self._writer = threading.Thread(target=self._flush_writes, name='notification-writer', daemon=True)
+        self._writer.start()
         
     def send_notification(self, 
                          recipient: str,
@@ -39,71 +296,290 @@ class NotificationService:
                          channels: List[NotificationChannel],
                          priority: NotificationPriority = NotificationPriority.MEDIUM,
                          metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Send notification through specified channels"""
+        """Queue a notification for background delivery through the specified channels.
+        
+        Returns as soon as the notification is queued; the delivered record, with
+        its final status, is stored by a worker. LOW priority notifications are
+        dropped when the queue is full, other priorities wait for space. Once
+        close() has been called, notifications are reported as failed instead.
+        """
         try:
-            notification_id = self._generate_notification_id()
+            if self._closing.is_set():
+                raise RuntimeError("Notification service is shutting down")
             
-            # Store notification record
-            notification_record = {
+            notification_id = self._generate_notification_id()
+            job = {
                 'id': notification_id,
                 'recipient': recipient,
-                'subject': subject,
-                'message': message,
-                'channels': [ch.value for ch in channels],
-                'priority': priority.value,
-                'metadata': metadata or {},
-                'created_at': datetime.utcnow().isoformat(),
-                'status': 'pending',
-                'delivery_attempts': {}
+                'prepared': self._prepare_notification(subject, message, channels, priority, metadata)
             }
-            
-            # Send through each channel
-            delivery_results = {}
-            for channel in channels:
-                try:
-                    if channel == NotificationChannel.EMAIL:
-                        result = self._send_email(recipient, subject, message)
-                    elif channel == NotificationChannel.SMS:
-                        result = self._send_sms(recipient, message)
-                    elif channel == NotificationChannel.PUSH:
-                        result = self._send_push(recipient, subject, message)
-                    elif channel == NotificationChannel.WEBHOOK:
-                        result = self._send_webhook(recipient, subject, message, metadata)
-                    elif channel == NotificationChannel.IN_APP:
-                        result = self._send_in_app(recipient, subject, message)
-                    else:
-                        result = {'success': False, 'error': 'Unknown channel'}
-                    
-                    delivery_results[channel.value] = result
-                    
-                except Exception as e:
-                    logger.error(f"Failed to send notification via {channel.value}: {e}")
-                    delivery_results[channel.value] = {'success': False, 'error': str(e)}
-            
-            # Update notification record
-            notification_record['delivery_attempts'] = delivery_results
-            notification_record['status'] = 'completed' if any(r.get('success') for r in delivery_results.values()) else 'failed'
-            
-            # Store in Redis
-            self.redis_client.setex(
-                f"notification:{notification_id}",
-                86400,  # 24 hours
-                json.dumps(notification_record)
-            )
-            
+            self._queue.put(job, block=priority != NotificationPriority.LOW)
             return {
                 'notification_id': notification_id,
-                'status': notification_record['status'],
-                'delivery_results': delivery_results
+                'status': 'queued'
             }
             
-        except Exception as e:
-            logger.error(f"Notification sending failed: {e}")
+        except queue.Full:
+            logger.warning(f"Notification queue full; dropped low priority notification to {recipient}")
             return {
                 'notification_id': None,
-                'status': 'failed',
-                'error': str(e)
+                'status': 'dropped'
             }
+        except Exception as e:
+            logger.error(f"Notification sending failed: {e}")
+            return self._failed_result(e)
+    
+    def close(self):
+        """Stop accepting queued notifications, deliver every accepted one, then flush buffered writes"""
+        self._closing.set()
+        self._queue.join()
+        
+        # Queued deliveries have all been recorded; the writer empties the buffer before exiting
+        self._writes_stopped.set()
+        self._writer.join()
+    
+    def _worker(self):
+        """Deliver queued notifications, storing each drained batch in one pipeline"""
+        while True:
+            jobs = [self._queue.get()]
+            while len(jobs) < NOTIFICATION_WORKER_BATCH:
+                try:
+                    jobs.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            try:
+                self._deliver_and_store(
+                    lambda job: self._deliver(job['recipient'], job['prepared'], notification_id=job['id']), jobs
+                )
+            except Exception as e:
+                logger.error(f"Notification worker failed: {e}")
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+    
+    def send_notifications_bulk(self, notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send many notifications, storing all of their records in one pipelined Redis round-trip"""
+        return self._deliver_and_store(self._deliver_notification, notifications)
+    
+    def send_to_recipients(self,
+                           recipients: List[str],
+                           subject: str,
+                           message: str,
+                           channels: List[NotificationChannel],
+                           priority: NotificationPriority = NotificationPriority.MEDIUM,
+                           metadata: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Send one notification to many recipients, preparing the shared fields once"""
+        prepared = self._prepare_notification(subject, message, channels, priority, metadata)
+        
+        # Identical emails go out as BCC batches instead of one SMTP transaction per recipient
+        email_results = {}
+        if NotificationChannel.EMAIL in channels and len(recipients) > 1:
+            email_results = self._send_email_bulk(recipients, subject, message)
+        
+        return self._deliver_and_store(
+            lambda recipient: self._deliver(recipient, prepared, email_results.get(recipient)), recipients
+        )
+    
+    async def send_notifications_bulk_async(self, notifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Event-loop friendly send_notifications_bulk: recipients are delivered concurrently"""
+        delivered = await asyncio.gather(
+            *(asyncio.to_thread(self._deliver_notification, notification) for notification in notifications),
+            return_exceptions=True
+        )
+        
+        results = []
+        async with self.async_redis_client.pipeline(transaction=False) as pipe:
+            for notification_record in delivered:
+                if isinstance(notification_record, Exception):
+                    logger.error(f"Notification sending failed: {notification_record}")
+                    results.append(self._failed_result(notification_record))
+                    continue
+                results.append(self._queue_record(pipe, notification_record))
+            
+            # Store every record in Redis without blocking the event loop
+            try:
+                await pipe.execute()
+            except Exception as e:
+                logger.error(f"Notification sending failed: {e}")
+                return [self._failed_result(e) for _ in results]
+        
+        return results
+    
+    def _deliver_and_store(self, deliver: Callable[[Any], Dict[str, Any]], items: List[Any]) -> List[Dict[str, Any]]:
+        """Deliver each item and store the resulting records in one pipelined Redis round-trip.
+        
+        LOW and MEDIUM priority records are handed to the background write buffer
+        instead, so only HIGH and CRITICAL sends wait for Redis.
+        """
+        results = []
+        stored_now = []
+        pipe = self.redis_client.pipeline(transaction=False)
+        
+        for item in items:
+            try:
+                notification_record = deliver(item)
+                if notification_record['priority'] in BUFFERED_PRIORITIES:
+                    self._write_buffer.append(notification_record)
+                    results.append(self._send_result(notification_record))
+                else:
+                    stored_now.append(len(results))
+                    results.append(self._queue_record(pipe, notification_record))
+            except Exception as e:
+                logger.error(f"Notification sending failed: {e}")
+                results.append(self._failed_result(e))
+        
+        if not stored_now:
+            return results
+        
+        # Store the remaining records in Redis
+        try:
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Notification sending failed: {e}")
+            for i in stored_now:
+                results[i] = self._failed_result(e)
+        
+        return results
+    
+    def _flush_writes(self):
+        """Store buffered notification records in pipelined batches until close() has flushed them all"""
+        # Errors are logged and never end the loop: this thread is the only writer for the buffer
+        while True:
+            stopping = self._writes_stopped.wait(WRITE_FLUSH_INTERVAL)
+            try:
+                while self._write_buffer:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    for _ in range(min(WRITE_FLUSH_BATCH, len(self._write_buffer))):
+                        notification_record = self._write_buffer.popleft()
+                        try:
+                            self._queue_record(pipe, notification_record)
+                        except Exception as e:
+                            logger.error(
+                                f"Dropping buffered notification {notification_record.get('id')}: {e}"
+                            )
+                    try:
+                        pipe.execute()
+                    except Exception as e:
+                        logger.error(f"Failed to store buffered notifications: {e}")
+            except Exception as e:
+                logger.error(f"Notification writer error: {e}")
+            
+            if stopping:
+                return
+    
+    def _prepare_notification(self,
+                              subject: str,
+                              message: str,
+                              channels: List[NotificationChannel],
+                              priority: NotificationPriority = NotificationPriority.MEDIUM,
+                              metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Render the recipient-independent fields of a notification"""
+        # Enum values are resolved once here; plain strings are accepted as well
+        channels = [NotificationChannel(ch) for ch in channels]
+        return {
+            'subject': subject,
+            'message': message,
+            'channels': channels,
+            'channel_values': [ch.value for ch in channels],
+            'priority_value': NotificationPriority(priority).value,
+            'metadata': metadata or {},
+            'created_at': utc_now_iso()
+        }
+    
+    def _deliver_notification(self, notification: Dict[str, Any]) -> Dict[str, Any]:
+        """Prepare and deliver a single send_notifications_bulk item"""
+        fields = dict(notification)
+        recipient = fields.pop('recipient')
+        return self._deliver(recipient, self._prepare_notification(**fields))
+    
+    def _deliver(self, recipient: str, prepared: Dict[str, Any],
+                 email_result: Optional[Dict[str, Any]] = None,
+                 notification_id: Optional[str] = None) -> Dict[str, Any]:
+        """Send one prepared notification through its channels and build its record.
+        
+        email_result is the outcome of an email already sent in a BCC batch.
+        """
+        subject = prepared['subject']
+        message = prepared['message']
+        metadata = prepared['metadata']
+        
+        notification_record = {
+            'id': notification_id or self._generate_notification_id(),
+            'recipient': recipient,
+            'subject': subject,
+            'message': message,
+            'channels': prepared['channel_values'],
+            'priority': prepared['priority_value'],
+            'metadata': metadata,
+            'created_at': prepared['created_at'],
+            'status': 'pending',
+            'delivery_attempts': {}
+        }
+        
+        # Send through every channel concurrently; total latency is the slowest channel
+        delivery_results = {}
+        success_seen = False
+        futures = {}
+        for channel, channel_value in zip(prepared['channels'], prepared['channel_values']):
+            if channel_value == 'email' and email_result is not None:
+                delivery_results[channel_value] = email_result
+                success_seen |= bool(email_result.get('success'))
+                continue
+            handler = self.CHANNEL_HANDLERS.get(channel)
+            if handler is None:
+                delivery_results[channel_value] = {'success': False, 'error': 'Unknown channel'}
+                continue
+            futures[channel_value] = channel_executor.submit(handler, self, recipient, subject, message, metadata)
+        
+        for channel_value, future in futures.items():
+            try:
+                result = future.result()
+                success_seen |= bool(result.get('success'))
+            except Exception as e:
+                logger.error(f"Failed to send notification via {channel_value}: {e}")
+                result = {'success': False, 'error': str(e)}
+            delivery_results[channel_value] = result
+        
+        # Update notification record
+        notification_record['delivery_attempts'] = delivery_results
+        notification_record['status'] = 'completed' if success_seen else 'failed'
+        return notification_record
+    
+    def _queue_record(self, pipe, notification_record: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a record and its history index entries on a pipeline; return the send result"""
+        notification_id = notification_record['id']
+        now = time.time()
+        
+        pipe.setex(
+            f"notification:{notification_id}",
+            NOTIFICATION_TTL,
+            serialize_record(notification_record)
+        )
+        
+        # Newest-first history indexes, trimmed to the records' lifetime
+        for index_key in (NOTIFICATION_INDEX, f"{NOTIFICATION_INDEX}:{notification_record['recipient']}"):
+            pipe.zadd(index_key, {notification_id: now})
+            pipe.zremrangebyscore(index_key, 0, now - NOTIFICATION_TTL)
+            pipe.expire(index_key, NOTIFICATION_TTL)
+        
+        return self._send_result(notification_record)
+    
+    def _send_result(self, notification_record: Dict[str, Any]) -> Dict[str, Any]:
+        """Result returned to callers for a delivered notification"""
+        return {
+            'notification_id': notification_record['id'],
+            'status': notification_record['status'],
+            'delivery_results': notification_record['delivery_attempts']
+        }
+    
+    def _failed_result(self, error: Exception) -> Dict[str, Any]:
+        """Result for a notification that could not be sent or stored"""
+        return {
+            'notification_id': None,
+            'status': 'failed',
+            'error': str(error)
+        }
     
     def send_delay_alert(self, schedule_id: int, delay_minutes: int, 
                         affected_passengers: int, recipients: List[str]) -> Dict[str, Any]:
@@ -120,22 +596,19 @@ class NotificationService:
             priority = NotificationPriority.MEDIUM
         
         # Send to all recipients
-        results = []
-        for recipient in recipients:
-            result = self.send_notification(
-                recipient=recipient,
-                subject=subject,
-                message=message,
-                channels=[NotificationChannel.EMAIL, NotificationChannel.IN_APP],
-                priority=priority,
-                metadata={
-                    'schedule_id': schedule_id,
-                    'delay_minutes': delay_minutes,
-                    'affected_passengers': affected_passengers,
-                    'alert_type': 'delay'
-                }
-            )
-            results.append(result)
+        results = self.send_to_recipients(
+            recipients=recipients,
+            subject=subject,
+            message=message,
+            channels=[NotificationChannel.EMAIL, NotificationChannel.IN_APP],
+            priority=priority,
+            metadata={
+                'schedule_id': schedule_id,
+                'delay_minutes': delay_minutes,
+                'affected_passengers': affected_passengers,
+                'alert_type': 'delay'
+            }
+        )
         
         return {
             'alert_type': 'delay',
@@ -151,22 +624,19 @@ class NotificationService:
         
         priority = NotificationPriority.HIGH if days_until_maintenance <= 3 else NotificationPriority.MEDIUM
         
-        results = []
-        for recipient in recipients:
-            result = self.send_notification(
-                recipient=recipient,
-                subject=subject,
-                message=message,
-                channels=[NotificationChannel.EMAIL],
-                priority=priority,
-                metadata={
-                    'train_id': train_id,
-                    'train_number': train_number,
-                    'days_until_maintenance': days_until_maintenance,
-                    'alert_type': 'maintenance'
-                }
-            )
-            results.append(result)
+        results = self.send_to_recipients(
+            recipients=recipients,
+            subject=subject,
+            message=message,
+            channels=[NotificationChannel.EMAIL],
+            priority=priority,
+            metadata={
+                'train_id': train_id,
+                'train_number': train_number,
+                'days_until_maintenance': days_until_maintenance,
+                'alert_type': 'maintenance'
+            }
+        )
         
         return {
             'alert_type': 'maintenance',
@@ -194,22 +664,19 @@ class NotificationService:
         if priority in [NotificationPriority.HIGH, NotificationPriority.CRITICAL]:
             channels.append(NotificationChannel.SMS)
         
-        results = []
-        for recipient in recipients:
-            result = self.send_notification(
-                recipient=recipient,
-                subject=subject,
-                message=message,
-                channels=channels,
-                priority=priority,
-                metadata={
-                    'incident_type': incident_type,
-                    'severity': severity,
-                    'affected_services': affected_services,
-                    'alert_type': 'incident'
-                }
-            )
-            results.append(result)
+        results = self.send_to_recipients(
+            recipients=recipients,
+            subject=subject,
+            message=message,
+            channels=channels,
+            priority=priority,
+            metadata={
+                'incident_type': incident_type,
+                'severity': severity,
+                'affected_services': affected_services,
+                'alert_type': 'incident'
+            }
+        )
         
         return {
             'alert_type': 'incident',
@@ -223,20 +690,17 @@ class NotificationService:
         subject = f"Performance Report - {report_data.get('period', 'Daily')}"
         message = self._format_performance_message(report_data)
         
-        results = []
-        for recipient in recipients:
-            result = self.send_notification(
-                recipient=recipient,
-                subject=subject,
-                message=message,
-                channels=[NotificationChannel.EMAIL],
-                priority=NotificationPriority.LOW,
-                metadata={
-                    'report_type': 'performance',
-                    'report_data': report_data
-                }
-            )
-            results.append(result)
+        results = self.send_to_recipients(
+            recipients=recipients,
+            subject=subject,
+            message=message,
+            channels=[NotificationChannel.EMAIL],
+            priority=NotificationPriority.LOW,
+            metadata={
+                'report_type': 'performance',
+                'report_data': report_data
+            }
+        )
         
         return {
             'alert_type': 'performance_report',
@@ -248,38 +712,53 @@ class NotificationService:
                                limit: int = 50) -> List[Dict[str, Any]]:
         """Get notification history"""
         try:
-            # Get notification keys from Redis
-            pattern = f"notification:*"
-            keys = self.redis_client.keys(pattern)
-            
-            notifications = []
-            for key in keys[-limit:]:
-                data = self.redis_client.get(key)
-                if data:
-                    notification = json.loads(data)
-                    if recipient is None or notification['recipient'] == recipient:
-                        notifications.append(notification)
+            # Newest notification ids from the history index, then one MGET for the records
+            index_key = f"{NOTIFICATION_INDEX}:{recipient}" if recipient is not None else NOTIFICATION_INDEX
+            notification_ids = self.redis_client.zrevrange(index_key, 0, limit - 1)
+            if not notification_ids:
+                return []
             
-            # Sort by creation time, newest first
-            notifications.sort(key=lambda x: x['created_at'], reverse=True)
-            return notifications[:limit]
+            records = self.redis_client.mget([b"notification:" + nid for nid in notification_ids])
+            return [deserialize_record(data) for data in records if data]
             
         except Exception as e:
             logger.error(f"Failed to get notification history: {e}")
             return []
     
+    def get_in_app_notifications(self, recipient: str, count: int = 50) -> List[Dict[str, Any]]:
+        """Get a recipient's most recent in-app notifications, newest first"""
+        try:
+            entries = self.redis_client.xrevrange(f"in_app:{recipient}", count=count)
+            return [
+                {
+                    'id': entry_id.decode(),
+                    **{field.decode(): value.decode() for field, value in fields.items()}
+                }
+                for entry_id, fields in entries
+            ]
+            
+        except Exception as e:
+            logger.error(f"Failed to get in-app notifications: {e}")
+            return []
+    
     def _send_email(self, recipient: str, subject: str, message: str) -> Dict[str, Any]:
         """Send email notification"""
         try:
-            # This is a placeholder implementation
-            # In a real system, you would configure SMTP settings
             logger.info(f"Sending email to {recipient}: {subject}")
             
-            # Simulate email sending
+            # Without an SMTP host the send is only logged
+            if settings.smtp_host:
+                msg = MIMEMultipart()
+                msg['From'] = settings.smtp_from_address
+                msg['To'] = recipient
+                msg['Subject'] = subject
+                msg.attach(MIMEText(message, 'plain'))
+                self.smtp_pool.send(msg, [recipient])
+            
             return {
                 'success': True,
                 'channel': 'email',
-                'sent_at': datetime.utcnow().isoformat()
+                'sent_at': utc_now_iso()
             }
             
         except Exception as e:
@@ -289,6 +768,41 @@ class NotificationService:
                 'error': str(e)
             }
     
+    def _send_email_bulk(self, recipients: List[str], subject: str, message: str,
+                         batch_size: int = EMAIL_BCC_BATCH_SIZE) -> Dict[str, Dict[str, Any]]:
+        """Send one email to many recipients as BCC batches; returns the result per recipient"""
+        results = {}
+        remaining = iter(recipients)
+        while batch := list(islice(remaining, batch_size)):
+            try:
+                logger.info(f"Sending email to {len(batch)} recipients: {subject}")
+                
+                if settings.smtp_host:
+                    # Recipients go only in the envelope, so they never see each other
+                    msg = MIMEMultipart()
+                    msg['From'] = settings.smtp_from_address
+                    msg['To'] = settings.smtp_from_address
+                    msg['Subject'] = subject
+                    msg.attach(MIMEText(message, 'plain'))
+                    self.smtp_pool.send(msg, batch)
+                
+                result = {
+                    'success': True,
+                    'channel': 'email',
+                    'sent_at': utc_now_iso()
+                }
+            except Exception as e:
+                result = {
+                    'success': False,
+                    'channel': 'email',
+                    'error': str(e)
+                }
+            
+            for recipient in batch:
+                results[recipient] = result
+        
+        return results
+    
     def _send_sms(self, recipient: str, message: str) -> Dict[str, Any]:
         """Send SMS notification"""
         try:
@@ -298,7 +812,7 @@ class NotificationService:
             return {
                 'success': True,
                 'channel': 'sms',
-                'sent_at': datetime.utcnow().isoformat()
+                'sent_at': utc_now_iso()
             }
             
         except Exception as e:
@@ -317,7 +831,7 @@ class NotificationService:
             return {
                 'success': True,
                 'channel': 'push',
-                'sent_at': datetime.utcnow().isoformat()
+                'sent_at': utc_now_iso()
             }
             
         except Exception as e:
@@ -331,13 +845,19 @@ class NotificationService:
                      metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
         """Send webhook notification"""
         try:
-            # Placeholder webhook implementation
             logger.info(f"Sending webhook to {recipient}: {subject}")
             
+            # The recipient of a webhook notification is the endpoint URL
+            response = self.http_client.post(
+                recipient,
+                json={'subject': subject, 'message': message, 'metadata': metadata or {}}
+            )
+            response.raise_for_status()
+            
             return {
                 'success': True,
                 'channel': 'webhook',
-                'sent_at': datetime.utcnow().isoformat()
+                'sent_at': utc_now_iso()
             }
             
         except Exception as e:
@@ -350,21 +870,22 @@ class NotificationService:
     def _send_in_app(self, recipient: str, subject: str, message: str) -> Dict[str, Any]:
         """Send in-app notification"""
         try:
-            # Store in-app notification in Redis
-            notification_key = f"in_app:{recipient}:{datetime.utcnow().timestamp()}"
-            notification_data = {
-                'subject': subject,
-                'message': message,
-                'created_at': datetime.utcnow().isoformat(),
-                'read': False
-            }
-            
-            self.redis_client.setex(notification_key, 604800, json.dumps(notification_data))  # 7 days
+            # Append to the recipient's capped in-app stream
+            stream_key = f"in_app:{recipient}"
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.xadd(
+                stream_key,
+                {'subject': subject, 'message': message, 'created_at': utc_now_iso()},
+                maxlen=IN_APP_STREAM_LENGTH,
+                approximate=True
+            )
+            pipe.expire(stream_key, IN_APP_TTL)
+            pipe.execute()
             
             return {
                 'success': True,
                 'channel': 'in_app',
-                'sent_at': datetime.utcnow().isoformat()
+                'sent_at': utc_now_iso()
             }
             
         except Exception as e:
@@ -375,77 +896,74 @@ class NotificationService:
             }
     
     def _generate_notification_id(self) -> str:
-        """Generate unique notification ID"""
-        import uuid
-        return str(uuid.uuid4())
-    
-    def _load_templates(self) -> Dict[str, str]:
-        """Load notification templates"""
-        return {
-            'delay_alert': "Train delay alert: Schedule {schedule_id} is delayed by {delay_minutes} minutes, affecting {affected_passengers} passengers.",
-            'maintenance_reminder': "Maintenance reminder: Train {train_number} requires maintenance in {days_until_maintenance} days.",
-            'incident_alert': "Incident alert: {incident_type} ({severity}) - {description}. Affected services: {affected_services}.",
-            'performance_report': "Performance report for {period}: {summary}"
-        }
+        """Generate a unique, time-sortable notification ID (UUIDv7 layout)"""
+        # 48-bit millisecond timestamp, version 7, 12 + 62 random bits around the RFC 4122 variant
+        random_bits = random.getrandbits(74)
+        return str(uuid.UUID(int=(
+            time.time_ns() // 1_000_000 << 80
+            | 0x7 << 76
+            | (random_bits >> 62) << 64
+            | 0b10 << 62
+            | random_bits & (1 << 62) - 1
+        )))
     
     def _format_delay_message(self, schedule_id: int, delay_minutes: int, affected_passengers: int) -> str:
         """Format delay alert message"""
-        return f"""
-        TRAIN DELAY ALERT
-        
-        Schedule ID: {schedule_id}
-        Delay: {delay_minutes} minutes
-        Affected Passengers: {affected_passengers}
-        
-        Please take appropriate action to minimize passenger impact.
-        
-        Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
-        """
+        return render_delay_message(schedule_id, delay_minutes, affected_passengers, utc_now_display())
     
     def _format_maintenance_message(self, train_number: str, days_until_maintenance: int) -> str:
         """Format maintenance reminder message"""
-        urgency = "URGENT" if days_until_maintenance <= 3 else "SCHEDULED"
-        
-        return f"""
-        {urgency} MAINTENANCE REMINDER
-        
-        Train: {train_number}
-        Maintenance Due: {days_until_maintenance} days
-        
-        Please schedule maintenance to avoid service disruption.
-        
-        Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
-        """
+        return render_maintenance_message(train_number, days_until_maintenance, utc_now_display())
     
     def _format_incident_message(self, incident_type: str, severity: str, 
                                 description: str, affected_services: List[str]) -> str:
         """Format incident alert message"""
-        return f"""
-        INCIDENT ALERT - {severity.upper()}
-        
-        Type: {incident_type.title()}
-        Severity: {severity.title()}
-        Description: {description}
-        
-        Affected Services:
-        {chr(10).join(f"- {service}" for service in affected_services)}
-        
-        Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
-        """
+        return self.MESSAGE_TEMPLATES['incident_alert'].format_map({
+            'severity_upper': severity.upper(),
+            'incident_type': incident_type.title(),
+            'severity': severity.title(),
+            'description': description,
+            'affected_services': "- " + "\n- ".join(affected_services) if affected_services else "",
+            'time': utc_now_display()
+        })
     
     def _format_performance_message(self, report_data: Dict[str, Any]) -> str:
         """Format performance report message"""
-        return f"""
-        PERFORMANCE REPORT - {report_data.get('period', 'Daily').upper()}
-        
-        Summary:
-        - On-time Performance: {report_data.get('on_time_performance', 0):.1f}%
-        - Total Schedules: {report_data.get('total_schedules', 0)}
-        - Completed Schedules: {report_data.get('completed_schedules', 0)}
-        - Average Delay: {report_data.get('average_delay', 0):.1f} minutes
-        
-        Time: {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC
-        """
+        return self.MESSAGE_TEMPLATES['performance_report'].format_map({
+            'period': report_data.get('period', 'Daily').upper(),
+            'on_time_performance': report_data.get('on_time_performance', 0),
+            'total_schedules': report_data.get('total_schedules', 0),
+            'completed_schedules': report_data.get('completed_schedules', 0),
+            'average_delay': report_data.get('average_delay', 0),
+            'time': utc_now_display()
+        })
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def render_delay_message(schedule_id: int, delay_minutes: int, affected_passengers: int, time_display: str) -> str:
+    """Render a delay alert body; repeats within the same minute are served from cache"""
+    return NotificationService.MESSAGE_TEMPLATES['delay_alert'].format_map({
+        'schedule_id': schedule_id,
+        'delay_minutes': delay_minutes,
+        'affected_passengers': affected_passengers,
+        'time': time_display
+    })
+
+@lru_cache(maxsize=MESSAGE_CACHE_SIZE)
+def render_maintenance_message(train_number: str, days_until_maintenance: int, time_display: str) -> str:
+    """Render a maintenance reminder body; repeats within the same minute are served from cache"""
+    return NotificationService.MESSAGE_TEMPLATES['maintenance_reminder'].format_map({
+        'urgency': "URGENT" if days_until_maintenance <= 3 else "SCHEDULED",
+        'train_number': train_number,
+        'days_until_maintenance': days_until_maintenance,
+        'time': time_display
+    })
+
+@cache
+def get_notification_service() -> NotificationService:
+    """Shared notification service, created on first use rather than at import"""
+    return NotificationService()
 
-# Global notification service instance
-notification_service = NotificationService()
+def close_notification_service():
+    """Drain the shared notification service on shutdown, if it was ever created"""
+    if get_notification_service.cache_info().currsize:
+        get_notification_service().close()
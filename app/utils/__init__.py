@@ -1,64 +1,60 @@
 """
 Utility functions and helpers for the Train Management System.
+
+Names are resolved lazily (PEP 562): the logger and validators submodules are
+only imported when one of their names is first accessed.
 """
 
-from app.utils.logger import (
-    setup_logger,
-    get_logger,
-    app_logger,
-    api_logger,
-    db_logger,
-    ml_logger,
-    optimization_logger,
-    simulation_logger,
-    LoggerMixin
-)
-from app.utils.validators import (
-    ValidationError,
-    validate_email_address,
-    validate_phone_number,
-    validate_train_number,
-    validate_track_code,
-    validate_station_code,
-    validate_coordinates,
-    validate_speed,
-    validate_capacity,
-    validate_time_range,
-    validate_date_range,
-    validate_json_data,
-    validate_priority,
-    validate_percentage,
-    sanitize_string,
-    TrainSystemValidators
-)
+import importlib
 
-__all__ = [
+# Public name -> submodule that defines it
+_LAZY = {
     # Logger utilities
-    "setup_logger",
-    "get_logger", 
-    "app_logger",
-    "api_logger",
-    "db_logger",
-    "ml_logger",
-    "optimization_logger",
-    "simulation_logger",
-    "LoggerMixin",
-    
+    **dict.fromkeys((
+        "setup_logger",
+        "get_logger",
+        "app_logger",
+        "api_logger",
+        "db_logger",
+        "ml_logger",
+        "optimization_logger",
+        "simulation_logger",
+        "LoggerMixin",
+    ), "app.utils.logger"),
+
     # Validation utilities
-    "ValidationError",
-    "validate_email_address",
-    "validate_phone_number",
-    "validate_train_number",
-    "validate_track_code", 
-    "validate_station_code",
-    "validate_coordinates",
-    "validate_speed",
-    "validate_capacity",
-    "validate_time_range",
-    "validate_date_range",
-    "validate_json_data",
-    "validate_priority",
-    "validate_percentage",
-    "sanitize_string",
-    "TrainSystemValidators"
-]
+    **dict.fromkeys((
+        "ValidationError",
+        "validate_email_address",
+        "validate_phone_number",
+        "validate_train_number",
+        "validate_track_code",
+        "validate_station_code",
+        "validate_coordinates",
+        "validate_coordinates_batch",
+        "validate_speed",
+        "validate_speed_batch",
+        "validate_capacity",
+        "validate_capacity_batch",
+        "validate_time_range",
+        "validate_date_range",
+        "validate_json_data",
+        "validate_priority",
+        "validate_percentage",
+        "sanitize_string",
+        "TrainSystemValidators",
+    ), "app.utils.validators"),
+}
+
+__all__ = list(_LAZY)
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY[name]), name)
+    globals()[name] = value  # Cache so later lookups skip __getattr__
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -1,35 +1,145 @@
 import logging
 import sys
+import atexit
+import queue
+import threading
+import time
+from functools import cached_property
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from typing import Optional
-from datetime import datetime
-import json
+import msgspec
+
+# Shared JSON encoder for log entries
+_json_encoder = msgspec.json.Encoder()
+
+# Attributes every LogRecord carries; records with more may have context extras
+_BASE_ATTRS = len(logging.LogRecord('', logging.INFO, '', 0, '', None, None).__dict__)
+
+# Extra record attributes copied into JSON log entries
+_EXTRA_FIELDS = ('user_id', 'train_id', 'request_id')
+
+# Per-thread log entry dict, cleared and refilled for each record JSONFormatter serializes
+_format_state = threading.local()
+
+# Log file rotation: size per file, rotated files kept, and write buffer size
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+LOG_FILE_BUFFER_SIZE = 64 * 1024
+
+# Log directories already created by setup_logger
+_created_log_dirs = set()
+
+# Background listeners doing formatting and I/O for each configured logger, by name
+_listeners = {}
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
+    # Whole second last formatted, and its formatted date/time part
+    _last_second = None
+    _last_prefix = ''
+    
+    def _timestamp(self, created: float) -> str:
+        """UTC ISO-8601 time of a record, re-running strftime only when the second changes"""
+        second = int(created)
+        if second != self._last_second:
+            self._last_second = second
+            self._last_prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(second))
+        return f"{self._last_prefix}.{int((created - second) * 1e6):06d}"
+    
     def format(self, record):
-        log_entry = {
-            'timestamp': datetime.utcnow().isoformat(),
-            'level': record.levelname,
-            'logger': record.name,
-            'message': record.getMessage(),
-            'module': record.module,
-            'function': record.funcName,
-            'line': record.lineno
-        }
+        try:
+            log_entry = _format_state.log_entry
+        except AttributeError:
+            log_entry = _format_state.log_entry = {}
+        log_entry.clear()
         
-        if hasattr(record, 'user_id'):
-            log_entry['user_id'] = record.user_id
-        if hasattr(record, 'train_id'):
-            log_entry['train_id'] = record.train_id
-        if hasattr(record, 'request_id'):
-            log_entry['request_id'] = record.request_id
+        log_entry['timestamp'] = self._timestamp(record.created)
+        log_entry['level'] = record.levelname
+        log_entry['logger'] = record.name
+        log_entry['message'] = record.getMessage()
+        log_entry['module'] = record.module
+        log_entry['function'] = record.funcName
+        log_entry['line'] = record.lineno
+        
+        attrs = record.__dict__
+        if len(attrs) > _BASE_ATTRS:
+            for field in _EXTRA_FIELDS:
+                if field in attrs:
+                    log_entry[field] = attrs[field]
             
         if record.exc_info:
             log_entry['exception'] = self.formatException(record.exc_info)
             
-        return json.dumps(log_entry)
+        return _json_encoder.encode(log_entry).decode()
+
+class _EnqueueHandler(QueueHandler):
+    """Queue handler that leaves formatting to the listener thread"""
+    
+    def prepare(self, record):
+        # Resolve %-args now so later mutation of the arguments can't change the message
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class _BufferedRotatingFileHandler(RotatingFileHandler):
+    """Rotating file handler that writes through a large buffer, flushed only on explicit flush()"""
+    
+    _emitting = False
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=LOG_FILE_BUFFER_SIZE,
+                    encoding='utf-8', errors=self.errors)
+    
+    def emit(self, record):
+        # StreamHandler.emit flushes after every record; keep those writes in the buffer
+        self._emitting = True
+        try:
+            super().emit(record)
+        finally:
+            self._emitting = False
+    
+    def flush(self):
+        if not self._emitting:
+            super().flush()
+
+class _BatchingHandler(MemoryHandler):
+    """Buffers records for a target handler, flushing by count, on errors, or at a fixed interval"""
+    
+    def __init__(self, target: logging.Handler, capacity: int = 512, interval: float = 1.0):
+        super().__init__(capacity, flushLevel=logging.ERROR, target=target, flushOnClose=True)
+        self._closed = threading.Event()
+        threading.Thread(target=self._flush_periodically, args=(interval,),
+                         name='log-flush', daemon=True).start()
+    
+    def _flush_periodically(self, interval: float):
+        while not self._closed.wait(interval):
+            self.flush()
+    
+    def flush(self):
+        super().flush()
+        # Push the handed-over batch through the target's own write buffer
+        with self.lock:
+            if self.target:
+                self.target.flush()
+    
+    def close(self):
+        self._closed.set()
+        target = self.target
+        super().close()
+        if target:
+            target.close()
+
+def _stop_listeners():
+    """Flush and stop every background log listener"""
+    for listener in _listeners.values():
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+    _listeners.clear()
+
+atexit.register(_stop_listeners)
 
 def setup_logger(
     name: str,
@@ -57,26 +167,46 @@ def setup_logger(
         )
         console_handler.setFormatter(formatter)
     
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     
     # File handler if specified
     if log_file:
-        log_path = Path(log_file)
-        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_dir = Path(log_file).parent
+        if log_dir not in _created_log_dirs:
+            log_dir.mkdir(parents=True, exist_ok=True)
+            _created_log_dirs.add(log_dir)
         
-        file_handler = logging.FileHandler(log_file)
+        file_handler = _BufferedRotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT, delay=True
+        )
         file_handler.setFormatter(JSONFormatter() if json_format else formatter)
-        logger.addHandler(file_handler)
+        handlers.append(_BatchingHandler(file_handler))
+    
+    # Callers only enqueue records; a listener thread formats and writes them
+    previous = _listeners.pop(name, None)
+    if previous:
+        previous.stop()
+        for handler in previous.handlers:
+            handler.close()
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[name] = listener
+    
+    logger.addHandler(_EnqueueHandler(log_queue))
     
     return logger
 
-# Application loggers
-app_logger = setup_logger("train_system.app")
-api_logger = setup_logger("train_system.api")
-db_logger = setup_logger("train_system.database")
-ml_logger = setup_logger("train_system.ml")
-optimization_logger = setup_logger("train_system.optimization")
-simulation_logger = setup_logger("train_system.simulation")
+# Application loggers propagate to one configured "train_system" logger,
+# so they share its formatter, handlers and listener thread
+setup_logger("train_system")
+app_logger = logging.getLogger("train_system.app")
+api_logger = logging.getLogger("train_system.api")
+db_logger = logging.getLogger("train_system.database")
+ml_logger = logging.getLogger("train_system.ml")
+optimization_logger = logging.getLogger("train_system.optimization")
+simulation_logger = logging.getLogger("train_system.simulation")
 
 def get_logger(name: str) -> logging.Logger:
     """Get logger by name"""
@@ -85,6 +215,6 @@ def get_logger(name: str) -> logging.Logger:
 class LoggerMixin:
     """Mixin to add logging capabilities to classes"""
     
-    @property
+    @cached_property
     def logger(self) -> logging.Logger:
         return get_logger(self.__class__.__name__.lower())
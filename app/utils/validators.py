@@ -1,55 +1,125 @@
-import re
-from typing import Any, Dict, List, Optional, Union
+import string
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import datetime, time
+import numpy as np
 from pydantic import validator
-import phonenumbers
-from email_validator import validate_email, EmailNotValidError
+
+# Characters allowed in (upper-cased) track codes
+_TRACK_CHARS = frozenset(string.ascii_uppercase + string.digits + '-')
+
+# str.translate table deleting ASCII control characters other than tab, newline and carriage return
+_CONTROL_CHARS = dict.fromkeys(set(range(32)) - {ord('\t'), ord('\n'), ord('\r')})
 
 class ValidationError(Exception):
     """Custom validation error"""
     pass
 
-def validate_email_address(email: str) -> str:
-    """Validate email address format"""
+def _strip_tags(value: str) -> str:
+    """Remove <...> tags in one left-to-right scan (the same matches as re.sub(r'<[^>]+>', ''))"""
+    parts = []
+    pos = 0
+    search = 0
+    while (start := value.find('<', search)) >= 0:
+        if value.startswith('>', start + 1):
+            # "<>" is not a tag; keep scanning after it
+            search = start + 1
+            continue
+        end = value.find('>', start + 1)
+        if end < 0:
+            break
+        parts.append(value[pos:start])
+        pos = search = end + 1
+    
+    parts.append(value[pos:])
+    return ''.join(parts)
+
+# phonenumbers and email_validator load large metadata tables, so they are imported
+# on first use rather than with this module.
+# Outcomes are cached as (ok, normalized value or error message) so failures are memoized too
+@lru_cache(maxsize=4096)
+def _check_email(email: str) -> Tuple[bool, str]:
+    from email_validator import validate_email, EmailNotValidError
+    
     try:
-        valid = validate_email(email)
-        return valid.email
+        return True, validate_email(email).email
     except EmailNotValidError:
-        raise ValidationError(f"Invalid email address: {email}")
+        return False, f"Invalid email address: {email}"
 
-def validate_phone_number(phone: str, country_code: str = "US") -> str:
-    """Validate phone number format"""
+@lru_cache(maxsize=4096)
+def _check_phone(phone: str, country_code: str) -> Tuple[bool, str]:
+    import phonenumbers
+    
     try:
         parsed = phonenumbers.parse(phone, country_code)
-        if not phonenumbers.is_valid_number(parsed):
-            raise ValidationError(f"Invalid phone number: {phone}")
-        return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
     except phonenumbers.NumberParseException:
-        raise ValidationError(f"Invalid phone number format: {phone}")
+        return False, f"Invalid phone number format: {phone}"
+    
+    if not phonenumbers.is_valid_number(parsed):
+        return False, f"Invalid phone number: {phone}"
+    return True, phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+
+def validate_email_address(email: str) -> str:
+    """Validate email address format"""
+    ok, result = _check_email(email)
+    if not ok:
+        raise ValidationError(result)
+    return result
+
+@lru_cache(maxsize=None)
+def _calling_code_regions() -> Dict[str, str]:
+    """Country calling code (as digits) -> main region, built once on first use"""
+    import phonenumbers
+    return {str(cc): regions[0] for cc, regions in phonenumbers.COUNTRY_CODE_TO_REGION_CODE.items()}
+
+def _e164_region(phone: str) -> Optional[str]:
+    """Region of a '+'-prefixed number from its 1-3 digit calling code (codes are prefix-free)"""
+    regions = _calling_code_regions()
+    for end in (2, 3, 4):
+        region = regions.get(phone[1:end])
+        if region:
+            return region
+    return None
+
+def validate_phone_number(phone: str, country_code: str = "US") -> str:
+    """Validate phone number format"""
+    # A '+' number carries its own country, so the caller's default region is irrelevant;
+    # resolving it up front lets every default region share one cached result
+    if phone.startswith('+'):
+        country_code = _e164_region(phone) or country_code
+    
+    ok, result = _check_phone(phone, country_code)
+    if not ok:
+        raise ValidationError(result)
+    return result
 
 def validate_train_number(train_number: str) -> str:
     """Validate train number format (alphanumeric, 3-10 characters)"""
-    if not re.match(r'^[A-Z0-9]{3,10}$', train_number.upper()):
+    train_number = train_number.upper()
+    if not (3 <= len(train_number) <= 10 and train_number.isascii() and train_number.isalnum()):
         raise ValidationError(
             "Train number must be 3-10 alphanumeric characters"
         )
-    return train_number.upper()
+    return train_number
 
-def validate_track_code(track_code: str) -> str:
+def validate_track_code(track_code: str, _allowed=_TRACK_CHARS.issuperset) -> str:
     """Validate track code format"""
-    if not re.match(r'^[A-Z0-9\-]{2,20}$', track_code.upper()):
+    track_code = track_code.upper()
+    if not (2 <= len(track_code) <= 20 and _allowed(track_code)):
         raise ValidationError(
             "Track code must be 2-20 characters (letters, numbers, hyphens)"
         )
-    return track_code.upper()
+    return track_code
 
 def validate_station_code(station_code: str) -> str:
     """Validate station code format (3-letter IATA-style codes)"""
-    if not re.match(r'^[A-Z]{3}$', station_code.upper()):
+    station_code = station_code.upper()
+    if not (len(station_code) == 3 and station_code.isascii() and station_code.isalpha()):
         raise ValidationError(
             "Station code must be exactly 3 uppercase letters"
         )
-    return station_code.upper()
+    return station_code
 
 def validate_coordinates(latitude: float, longitude: float) -> tuple[float, float]:
     """Validate GPS coordinates"""
@@ -59,6 +129,48 @@ def validate_coordinates(latitude: float, longitude: float) -> tuple[float, floa
         raise ValidationError(f"Longitude must be between -180 and 180: {longitude}")
     return latitude, longitude
 
+@lru_cache(maxsize=None)
+def _batch_kernels() -> SimpleNamespace:
+    """Compile the batch bound-check kernels on first use, keeping numba out of module import.
+    
+    Each kernel returns the first out-of-range row, or -1 when every row is valid.
+    """
+    from numba import njit, prange
+    
+    @njit(parallel=True)
+    def coordinates(latitudes, longitudes):
+        n = latitudes.shape[0]
+        first_bad = n
+        for i in prange(n):
+            if not (-90.0 <= latitudes[i] <= 90.0 and -180.0 <= longitudes[i] <= 180.0):
+                first_bad = min(first_bad, i)
+        return first_bad if first_bad < n else -1
+    
+    @njit(parallel=True)
+    def bounds(values, low, high):
+        n = values.shape[0]
+        first_bad = n
+        for i in prange(n):
+            if not (low <= values[i] <= high):
+                first_bad = min(first_bad, i)
+        return first_bad if first_bad < n else -1
+    
+    return SimpleNamespace(coordinates=coordinates, bounds=bounds)
+
+def validate_coordinates_batch(latitudes: Any, longitudes: Any) -> Tuple[np.ndarray, np.ndarray]:
+    """Validate arrays of GPS coordinates, reporting the first invalid row"""
+    latitudes = np.ascontiguousarray(latitudes, dtype=np.float64)
+    longitudes = np.ascontiguousarray(longitudes, dtype=np.float64)
+    if latitudes.shape != longitudes.shape or latitudes.ndim != 1:
+        raise ValidationError("Latitudes and longitudes must be 1-D arrays of equal length")
+    
+    row = _batch_kernels().coordinates(latitudes, longitudes)
+    if row >= 0:
+        raise ValidationError(
+            f"Invalid coordinates at row {row}: ({latitudes[row]}, {longitudes[row]})"
+        )
+    return latitudes, longitudes
+
 def validate_speed(speed: float, max_speed: float = 500.0) -> float:
     """Validate speed value (km/h)"""
     if speed < 0:
@@ -75,6 +187,33 @@ def validate_capacity(capacity: int, min_capacity: int = 1, max_capacity: int =
         )
     return capacity
 
+def validate_speed_batch(speeds: Any, max_speed: float = 500.0) -> np.ndarray:
+    """Validate an array of speed values (km/h), reporting the first invalid row"""
+    speeds = np.ascontiguousarray(speeds, dtype=np.float64).ravel()
+    row = _batch_kernels().bounds(speeds, 0.0, float(max_speed))
+    if row >= 0:
+        raise ValidationError(f"Speed at row {row} must be between 0 and {max_speed} km/h: {speeds[row]}")
+    return speeds
+
+def validate_capacity_batch(capacities: Any, min_capacity: int = 1, max_capacity: int = 2000) -> np.ndarray:
+    """Validate an array of passenger capacities, reporting the first invalid row"""
+    values = np.asarray(capacities).ravel()
+    if values.dtype.kind not in 'biu':
+        # Reject fractional (and NaN/inf) input rather than letting the int64 cast truncate it
+        values = values.astype(np.float64)
+        bad = np.flatnonzero(~np.isfinite(values) | (values != np.floor(values)))
+        if bad.size:
+            row = bad[0]
+            raise ValidationError(f"Capacity at row {row} must be a whole number: {values[row]}")
+    
+    capacities = np.ascontiguousarray(values, dtype=np.int64)
+    row = _batch_kernels().bounds(capacities, np.int64(min_capacity), np.int64(max_capacity))
+    if row >= 0:
+        raise ValidationError(
+            f"Capacity at row {row} must be between {min_capacity} and {max_capacity}: {capacities[row]}"
+        )
+    return capacities
+
 def validate_time_range(start_time: time, end_time: time) -> tuple[time, time]:
     """Validate that end time is after start time"""
     if end_time <= start_time:
@@ -97,8 +236,9 @@ def validate_json_data(data: Any, required_fields: List[str] = None) -> Dict[str
         raise ValidationError("Data must be a JSON object")
     
     if required_fields:
-        missing_fields = [field for field in required_fields if field not in data]
-        if missing_fields:
+        if not data.keys() >= set(required_fields):
+            # Only a failing check pays for listing the missing fields, in their given order
+            missing_fields = [field for field in required_fields if field not in data]
             raise ValidationError(f"Missing required fields: {missing_fields}")
     
     return data
@@ -122,15 +262,16 @@ def sanitize_string(value: str, max_length: int = 255, allow_html: bool = False)
     if not isinstance(value, str):
         raise ValidationError("Value must be a string")
     
-    # Remove leading/trailing whitespace
-    value = value.strip()
+    # Drop control characters and leading/trailing whitespace
+    value = value.translate(_CONTROL_CHARS).strip()
     
     if len(value) > max_length:
         raise ValidationError(f"String exceeds maximum length {max_length}: {len(value)}")
     
     if not allow_html:
-        # Basic HTML tag removal
-        value = re.sub(r'<[^>]+>', '', value)
+        # Basic HTML tag removal, skipped outright when there is no '<'
+        if '<' in value:
+            value = _strip_tags(value)
     
     return value
 
@@ -0,0 +1,34 @@
+import warnings
+import numpy as np
+import pytest
+from app.services.ml_predictor import MLPredictor
+
+@pytest.fixture
+def predictor():
+    # The feature builders don't touch the models, so skip loading them
+    return MLPredictor.__new__(MLPredictor)
+
+@pytest.mark.parametrize('departure', [
+    '2025-03-10T08:30:00',
+    '2025-03-10T08:30:00+05:30',
+    '2025-03-10T23:45:00-08:00',
+    '2024-02-29T00:15:00+00:00',
+])
+def test_batch_delay_features_match_single_row(predictor, departure):
+    schedules = [
+        {'scheduled_departure': departure, 'distance': 250, 'priority': 2},
+        {'scheduled_departure': '2025-12-31T23:59:59+01:00', 'temperature': -5},
+    ]
+    
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')  # datetime64 warns when it drops a UTC offset
+        batch = predictor._prepare_delay_features_batch(schedules)
+    single = np.stack([predictor._prepare_delay_features(schedule) for schedule in schedules])
+    
+    np.testing.assert_array_equal(batch, single)
+
+def test_offset_departure_keeps_wall_clock_time(predictor):
+    features = predictor._prepare_delay_features_batch([{'scheduled_departure': '2025-03-10T08:30:00+05:30'}])
+    
+    # hour, weekday, day, month of the local departure, not its UTC equivalent
+    assert features[0, :4].tolist() == [8, 0, 10, 3]